@@ -4,29 +4,32 @@ Handles domain-specific conversations and stores chat history in MongoDB
 """
 import os
 import json
+import logging
 import re
 from datetime import datetime
 import time
-import urllib.request
-import urllib.error
-import urllib.parse
 import asyncio
 from typing import Dict, List, Optional
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
 import google.generativeai as genai
 from pydantic import BaseModel
 from motor.motor_asyncio import AsyncIOMotorDatabase
-import redis
+import redis.asyncio as aioredis
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configure Gemini AI - single API key
 def _get_gemini_api_key() -> str:
     """Get the single Gemini API key from environment"""
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
-        print("Warning: No Gemini API key found. Set GEMINI_API_KEY in .env")
+        logger.warning("No Gemini API key found. Set GEMINI_API_KEY in .env")
         return "YOUR_GEMINI_API_KEY"
     return api_key.strip()
 
@@ -146,7 +149,7 @@ class ChatHistory(BaseModel):
     updated_at: datetime
 
 class GeminiChatbot:
-    def __init__(self, mongo_db: AsyncIOMotorDatabase, redis_client: Optional[redis.Redis] = None):
+    def __init__(self, mongo_db: AsyncIOMotorDatabase, redis_client: Optional[aioredis.Redis] = None):
         self.mongo_db = mongo_db
         self.redis_client = redis_client
         # Single API key configuration
@@ -156,6 +159,21 @@ class GeminiChatbot:
         # Elasticsearch endpoint (optional). If not running, logging will be skipped gracefully.
         self.elasticsearch_url = os.getenv("ELASTICSEARCH_URL", "http://localhost:9200")
         self.elasticsearch_index = os.getenv("ELASTICSEARCH_INDEX", "chatbot_logs")
+        self._es_doc_url = f"{self.elasticsearch_url.rstrip('/')}/{self.elasticsearch_index}/_doc"
+        # Log documents go through a bounded queue drained by a few writer tasks: chat replies never wait
+        # on Elasticsearch, and a burst can't occupy the shared to_thread pool (TTS, bcrypt). Documents
+        # are only dropped when the queue is full.
+        es_concurrency = int(os.getenv("ELASTICSEARCH_LOG_CONCURRENCY", "4"))
+        self._es_concurrency = es_concurrency
+        self._es_queue: asyncio.Queue = asyncio.Queue(maxsize=int(os.getenv("ELASTICSEARCH_LOG_QUEUE_SIZE", "1000")))
+        self._es_writers: List[asyncio.Task] = []
+        self._es_dropped = 0
+        # One keep-alive session for all log writes instead of a new TCP connection per chat turn,
+        # with a pool large enough that every concurrent writer keeps its connection warm
+        self._es_session = requests.Session()
+        self._es_session.headers["Content-Type"] = "application/json"
+        self._es_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=es_concurrency))
+        self._es_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=es_concurrency))
         # Load domain-specific data
         self.domain_data_cache = {}
         self._load_domain_data()
@@ -167,14 +185,14 @@ class GeminiChatbot:
         
         """Initialize Gemini AI with the configured API key."""
         try:
-            print(f"Gemini: configuring with API key")
+            logger.info("Gemini: configuring with API key")
             self._configure_genai()
             self.model = genai.GenerativeModel('gemini-2.5-flash')
             self.llm_available = True
-            print("Gemini: LLM initialized successfully")
+            logger.info("Gemini: LLM initialized successfully")
         except Exception as e:
             self.llm_available = False
-            print(f"Gemini init error: {e}")
+            logger.error("Gemini init error: %s", e)
 
     def _load_domain_data(self) -> None:
         """Load domain-specific data from JSON files"""
@@ -195,12 +213,12 @@ class GeminiChatbot:
                 if os.path.exists(file_path):
                     with open(file_path, "r", encoding="utf-8") as f:
                         self.domain_data_cache[domain_name] = json.load(f)
-                    print(f"✅ Loaded {len(self.domain_data_cache[domain_name])} Q&A pairs for {domain_name}")
+                    logger.info("Loaded %d Q&A pairs for %s", len(self.domain_data_cache[domain_name]), domain_name)
                 else:
-                    print(f"⚠️ Domain data file not found: {file_path}")
+                    logger.warning("Domain data file not found: %s", file_path)
                     self.domain_data_cache[domain_name] = []
             except Exception as e:
-                print(f"❌ Error loading domain data for {domain_name}: {e}")
+                logger.error("Error loading domain data for %s: %s", domain_name, e)
                 self.domain_data_cache[domain_name] = []
     
     def _find_relevant_answer(self, user_query: str, domain_data: List[Dict]) -> Optional[str]:
@@ -265,7 +283,7 @@ class GeminiChatbot:
         
         # Lower threshold (25%) for better coverage, but still ensure quality matches
         if best_score >= 0.25:
-            print(f"[DEBUG] Domain data match found with score: {best_score:.2f}")
+            logger.debug("Domain data match found with score: %.2f", best_score)
             return best_match
         
         return None
@@ -351,7 +369,7 @@ class GeminiChatbot:
                     if text_value and str(text_value).strip():
                         return str(text_value).strip()
             except Exception as e:
-                print(f"[DEBUG] Method 1 failed: {e}")
+                logger.debug("Method 1 failed: %s", e)
 
             # Method 2: Candidates structure (most common)
             try:
@@ -409,10 +427,10 @@ class GeminiChatbot:
                                 if parts_text:
                                     return parts_text
                         except Exception as e:
-                            print(f"[DEBUG] Error processing candidate: {e}")
+                            logger.debug("Error processing candidate: %s", e)
                             continue
             except Exception as e:
-                print(f"[DEBUG] Method 2 failed: {e}")
+                logger.debug("Method 2 failed: %s", e)
             
             # Method 3: Try string conversion
             try:
@@ -422,7 +440,7 @@ class GeminiChatbot:
                     if len(response_str) > 50 and not response_str.startswith('<'):
                         return response_str.strip()
             except Exception as e:
-                print(f"[DEBUG] Method 3 failed: {e}")
+                logger.debug("Method 3 failed: %s", e)
                 
             # Method 4: Raw dictionary access
             try:
@@ -437,7 +455,7 @@ class GeminiChatbot:
                                 if parts_text:
                                     return parts_text
             except Exception as e:
-                print(f"[DEBUG] Method 4 failed: {e}")
+                logger.debug("Method 4 failed: %s", e)
                 
             return ""
 
@@ -458,7 +476,7 @@ class GeminiChatbot:
                 async def _call_gen():
                     return await asyncio.to_thread(self.model.generate_content, current_prompt, **gen_kwargs)
 
-                print(f"[DEBUG] Attempt {attempt + 1}: Calling Gemini API with prompt length {len(current_prompt)}")
+                logger.debug("Attempt %d: Calling Gemini API with prompt length %d", attempt + 1, len(current_prompt))
                 response = await asyncio.wait_for(_call_gen(), timeout=30.0)
                 
                 # Try to extract response text
@@ -466,22 +484,22 @@ class GeminiChatbot:
                 
                 # Debug: Print response structure if extraction failed
                 if not response_text:
-                    print(f"[DEBUG] Response extraction failed. Response type: {type(response)}")
-                    print(f"[DEBUG] Response attributes: {dir(response)}")
+                    logger.debug("Response extraction failed. Response type: %s", type(response))
+                    logger.debug("Response attributes: %s", dir(response))
                     if hasattr(response, 'prompt_feedback'):
-                        print(f"[DEBUG] Prompt feedback: {response.prompt_feedback}")
+                        logger.debug("Prompt feedback: %s", response.prompt_feedback)
                     if hasattr(response, 'candidates'):
-                        print(f"[DEBUG] Candidates: {response.candidates}")
+                        logger.debug("Candidates: %s", response.candidates)
                 
                 # If we got a valid response, return it
                 if response_text:
-                    print(f"[DEBUG] Successfully extracted response ({len(response_text)} chars)")
+                    logger.debug("Successfully extracted response (%d chars)", len(response_text))
                     return response_text
                 
                 # If we're on the last attempt, log more details
                 if attempt == 2:
-                    print(f"[ERROR] Failed to get response after 3 attempts. Response object: {response}")
-                    print(f"[ERROR] Trying fallback extraction methods...")
+                    logger.error("Failed to get response after 3 attempts. Response object: %s", response)
+                    logger.error("Trying fallback extraction methods...")
                     # Try one more direct extraction
                     try:
                         if hasattr(response, 'text'):
@@ -493,13 +511,11 @@ class GeminiChatbot:
                     return "I'm temporarily unable to respond. Please try again with a different question or check back later."
                 
                 # Otherwise, log and continue to next attempt
-                print(f"[Attempt {attempt + 1}] Empty response, retrying with different prompt...")
+                logger.warning("Attempt %d: Empty response, retrying with different prompt...", attempt + 1)
                 
             except Exception as e:
                 err_msg = str(e)
-                print(f"[ERROR] Gemini attempt {attempt + 1} failed: {err_msg}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Gemini attempt %d failed: %s", attempt + 1, err_msg)
                 
                 # If it's the last attempt, return a fallback message
                 if attempt == 2:
@@ -510,13 +526,13 @@ class GeminiChatbot:
                     # extract retry delay if mentioned
                     match = re.search(r"retry in ([0-9.]+)s", err_msg)
                     delay = float(match.group(1)) if match else 30.0
-                    print(f"⚠️ Quota hit. Retrying in {delay:.1f}s...")
+                    logger.warning("Quota hit. Retrying in %.1fs...", delay)
                     await asyncio.sleep(delay)
                     continue
 
                 # Handle timeout or transient network errors
                 if "timeout" in err_msg.lower():
-                    print("⚠️ Timeout — retrying in 5s...")
+                    logger.warning("Timeout - retrying in 5s...")
                     await asyncio.sleep(5)
                     continue
 
@@ -535,7 +551,7 @@ class GeminiChatbot:
             if self.redis_client:
                 cached_messages = await self.get_cached_messages(conversation_id)
                 if cached_messages:
-                    print(f"✅ Retrieved {len(cached_messages)} messages from Redis cache for conversation {conversation_id}")
+                    logger.debug("Retrieved %d messages from Redis cache for conversation %s", len(cached_messages), conversation_id)
                     return cached_messages
             
             # Fallback to MongoDB
@@ -547,11 +563,11 @@ class GeminiChatbot:
             # Cache the messages in Redis for future fast access
             if messages and self.redis_client:
                 await self.cache_recent_messages(conversation_id, messages[-10:])  # Cache last 10 messages
-                print(f"✅ Cached {len(messages[-10:])} recent messages from MongoDB to Redis for conversation {conversation_id}")
+                logger.debug("Cached %d recent messages from MongoDB to Redis for conversation %s", len(messages[-10:]), conversation_id)
             
             return messages
         except Exception as e:
-            print(f"❌ Error fetching conversation history: {e}")
+            logger.error("Error fetching conversation history: %s", e)
             return []
     
     async def save_conversation(self, conversation_id: str, user_id: str, domain: str, messages: List[Dict]):
@@ -566,7 +582,7 @@ class GeminiChatbot:
                 "updated_at": datetime.utcnow()
             }
             
-            print(f"💾 Saving conversation {conversation_id} for user {user_id} in domain {domain} with {len(messages)} messages")
+            logger.debug("Saving conversation %s for user %s in domain %s with %d messages", conversation_id, user_id, domain, len(messages))
             
             result = await self.mongo_db.conversations.update_one(
                 {"conversation_id": conversation_id},
@@ -575,41 +591,33 @@ class GeminiChatbot:
             )
             
             if os.getenv("CHATBOT_DEBUG", "").lower() in ("1", "true", "yes"):
-                print(f"Saved conversation {conversation_id} to MongoDB - Domain: {domain}, Messages: {len(messages)}, User: {user_id}")
-                print(f"MongoDB result: {result.upserted_id if result.upserted_id else result.modified_count} documents affected")
+                logger.info("Saved conversation %s to MongoDB - Domain: %s, Messages: %d, User: %s", conversation_id, domain, len(messages), user_id)
+                logger.debug("MongoDB result: %s documents affected", result.upserted_id if result.upserted_id else result.modified_count)
             
             # Also cache all messages in Redis for fast access (if Redis is available)
             if self.redis_client:
                 await self.cache_recent_messages(conversation_id, messages)  # All messages
-                print(f"✅ Cached all {len(messages)} messages for conversation {conversation_id} in Redis")
+                logger.debug("Cached all %d messages for conversation %s in Redis", len(messages), conversation_id)
             
         except Exception as e:
-            print(f"❌ Error saving conversation: {e}")
+            logger.error("Error saving conversation: %s", e)
     
     async def cache_recent_messages(self, conversation_id: str, messages: List[Dict]):
         """Cache recent messages in Redis for fast access using async redis_client"""
         # Temporarily disable Redis caching to isolate issues
         if not self.redis_client or os.getenv("DISABLE_REDIS_CACHE", "0") == "1":
-            print(f"[DEBUG] Redis caching disabled for conversation {conversation_id}")
+            logger.debug("Redis caching disabled for conversation %s", conversation_id)
             return
         try:
             # Import the async Redis functions
-            from redis_client import push_message
-            
-            # Clear existing cache first
-            redis_key = f"chat:{conversation_id}"
-            self.redis_client.delete(redis_key)
-            
-            # Add each message using the async push_message function
-            for message in messages:
-                await push_message(conversation_id, message)
+            from redis_client import replace_messages
             
-            # Set expiration to 24 hours
-            self.redis_client.expire(redis_key, 86400)
+            # Clear existing cache, add all messages and set a 24 hour expiry in one pipelined round trip
+            await replace_messages(conversation_id, messages, ttl=86400)
             if os.getenv("CHATBOT_DEBUG", "").lower() in ("1", "true", "yes"):
-                print(f"Cached {len(messages)} messages for conversation {conversation_id} in Redis")
+                logger.debug("Cached %d messages for conversation %s in Redis", len(messages), conversation_id)
         except Exception as e:
-            print(f"[DEBUG] Error caching messages in Redis: {e}")
+            logger.warning("Error caching messages in Redis: %s", e)
     
     async def get_cached_messages(self, conversation_id: str) -> List[Dict]:
         """Get cached messages from Redis using async redis_client"""
@@ -620,13 +628,13 @@ class GeminiChatbot:
             from redis_client import get_messages
             return await get_messages(conversation_id)
         except Exception as e:
-            print(f"❌ Error getting cached messages: {e}")
+            logger.error("Error getting cached messages: %s", e)
             return []
     
     async def process_query(self, query: ChatQuery) -> ChatResponse:
         """Process a chat query and return AI response"""
-        print(f"[DEBUG] Processing query for user {query.user_id}, conversation {query.conversation_id}")
-        print(f"[DEBUG] LLM available: {self.llm_available}")
+        logger.debug("Processing query for user %s, conversation %s", query.user_id, query.conversation_id)
+        logger.debug("LLM available: %s", self.llm_available)
         
         try:
             # Map domain ID to domain name (restricted)
@@ -704,7 +712,7 @@ KNOWLEDGE BASE INFORMATION:
 User's Question: {query.question}
 
 You MUST answer using the above knowledge base information. Be CONCISE (2-3 short paragraphs or bullet points). Get straight to the point with the key information."""
-                    print(f"[DEBUG] Found relevant domain data for {domain_name} (1 exact match + {len(relevant_qas)} relevant items)")
+                    logger.debug("Found relevant domain data for %s (1 exact match + %d relevant items)", domain_name, len(relevant_qas))
                 elif relevant_qas:
                     # No exact match, but we have relevant Q&As - provide them all
                     context_text = ""
@@ -720,7 +728,7 @@ KNOWLEDGE BASE INFORMATION:
 User's Question: {query.question}
 
 Use the relevant information from the knowledge base above to answer the question CONCISELY (2-4 short paragraphs or bullet points). If multiple items are relevant, summarize the key points briefly. Base your answer on this data, not general knowledge."""
-                    print(f"[DEBUG] No exact match, but found {len(relevant_qas)} relevant Q&As for {domain_name}")
+                    logger.debug("No exact match, but found %d relevant Q&As for %s", len(relevant_qas), domain_name)
                 else:
                     # No relevant data found - still provide domain context for Gemini to work with
                     # Give Gemini a few example Q&As from this domain so it knows the domain style
@@ -736,9 +744,9 @@ Example knowledge base entries:
 User's Question: {query.question}
 
 Answer the question CONCISELY (2-3 short paragraphs) in the same style as the examples above. Be brief, direct, and informative."""
-                    print(f"[DEBUG] No relevant match found, but providing domain context examples for {domain_name}")
+                    logger.debug("No relevant match found, but providing domain context examples for %s", domain_name)
             else:
-                print(f"[DEBUG] No domain data available for {domain_name}")
+                logger.debug("No domain data available for %s", domain_name)
             
             # Create the prompt
             if domain_data_context:
@@ -792,18 +800,18 @@ Instructions:
                 # Check prompt length and truncate if necessary (Gemini has token limits)
                 max_prompt_length = 30000  # Rough estimate for safety
                 if len(prompt) > max_prompt_length:
-                    print(f"[WARNING] Prompt too long ({len(prompt)} chars), truncating to {max_prompt_length}")
+                    logger.warning("Prompt too long (%d chars), truncating to %d", len(prompt), max_prompt_length)
                     # Keep the beginning and end, truncate middle
                     keep_start = prompt[:5000]
                     keep_end = prompt[-5000:]
                     prompt = keep_start + "\n\n[... context truncated ...]\n\n" + keep_end
                 
-                print(f"[DEBUG] Calling ask_llm with prompt length: {len(prompt)}")
+                logger.debug("Calling ask_llm with prompt length: %d", len(prompt))
                 answer = await self.ask_llm(prompt)
-                print(f"[DEBUG] ask_llm returned answer length: {len(answer) if answer else 0}")
+                logger.debug("ask_llm returned answer length: %d", len(answer) if answer else 0)
                 
                 if not answer or len(answer.strip()) < 10:
-                    print(f"[WARNING] Answer seems too short or empty: '{answer}'")
+                    logger.warning("Answer seems too short or empty: %r", answer)
                 
                 # Clean up the response - preserve useful formatting but remove excessive markdown
                 if answer:
@@ -821,7 +829,7 @@ Instructions:
                     answer = answer.strip()
                     
             except Exception as e:
-                print(f"[ask_llm ERROR]: {e}")
+                logger.error("ask_llm error: %s", e)
                 answer = ""
             
             if not answer:
@@ -836,7 +844,7 @@ Instructions:
                 try:
                     tts_audio_path = await self.generate_tts(answer, conversation_id)
                 except Exception as e:
-                    print(f"[DEBUG] TTS generation failed: {e}")
+                    logger.warning("TTS generation failed: %s", e)
                     tts_audio_path = ""
 
             latency_ms = int((time.perf_counter() - start_time) * 1000)
@@ -860,22 +868,18 @@ Instructions:
             # Save conversation
             await self.save_conversation(conversation_id, query.user_id, domain_name, updated_messages)
 
-            # Fire-and-forget: log to Elasticsearch (non-blocking)
-            try:
-                await self.log_to_elasticsearch(
-                    {
-                        "conversation_id": conversation_id,
-                        "user_id": query.user_id,
-                        "domain": domain_name,
-                        "question": query.question,
-                        "answer": answer,
-                        "response_time_ms": latency_ms,
-                        "timestamp": datetime.utcnow().isoformat(),
-                    }
-                )
-            except Exception as _log_err:
-                # Swallow logging errors to avoid impacting user flow
-                print(f"⚠️ Elasticsearch logging skipped: {_log_err}")
+            # Fire-and-forget: log to Elasticsearch off the response path
+            self._enqueue_es_log(
+                {
+                    "conversation_id": conversation_id,
+                    "user_id": query.user_id,
+                    "domain": domain_name,
+                    "question": query.question,
+                    "answer": answer,
+                    "response_time_ms": latency_ms,
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            )
             
             return ChatResponse(
                 answer=answer,
@@ -886,7 +890,7 @@ Instructions:
             )
             
         except Exception as e:
-            print(f"[process_query ERROR]: {e}")
+            logger.exception("process_query error: %s", e)
             return ChatResponse(
                 answer=f"I apologize, but I encountered an error processing your request. Please try again later.",
                 conversation_id=query.conversation_id or f"conv_{query.user_id}_{int(datetime.utcnow().timestamp())}",
@@ -898,7 +902,7 @@ Instructions:
         Generate TTS audio from the assistant's text.
         Returns the local file path of the audio.
         """
-        print(f"[DEBUG] Starting TTS generation for conversation {conversation_id}")
+        logger.debug("Starting TTS generation for conversation %s", conversation_id)
         try:
             import pyttsx3
             import os
@@ -909,49 +913,65 @@ Instructions:
             os.makedirs(audio_dir, exist_ok=True)
             base_name = f"{conversation_id}_{int(datetime.utcnow().timestamp())}.wav"
             filename = os.path.join(audio_dir, base_name)
-            print(f"[DEBUG] TTS filename: {filename}")
+            logger.debug("TTS filename: %s", filename)
 
             def _synthesize():
-                print(f"[DEBUG] Initializing TTS engine")
+                logger.debug("Initializing TTS engine")
                 engine = pyttsx3.init()
-                print(f"[DEBUG] Saving TTS to file: {filename}")
+                logger.debug("Saving TTS to file: %s", filename)
                 engine.save_to_file(text, filename)
-                print(f"[DEBUG] Running TTS engine")
+                logger.debug("Running TTS engine")
                 engine.runAndWait()
-                print(f"[DEBUG] TTS generation completed")
+                logger.debug("TTS generation completed")
 
             await asyncio.to_thread(_synthesize)
             tts_path = f"/tts/{base_name}"
-            print(f"[DEBUG] TTS path returned: {tts_path}")
+            logger.debug("TTS path returned: %s", tts_path)
             return tts_path
         except Exception as e:
-            print(f"[DEBUG] TTS generation failed: {e}")
+            logger.warning("TTS generation failed: %s", e)
             return ""
 
     async def log_to_elasticsearch(self, document: Dict) -> None:
-        """Send a single log document to Elasticsearch using standard library, without blocking the main flow."""
+        """Send a single log document to Elasticsearch over a pooled requests session, without blocking the main flow."""
         # If ES URL seems disabled, skip
         if not self.elasticsearch_url:
             return
         try:
-            url = f"{self.elasticsearch_url.rstrip('/')}/{self.elasticsearch_index}/_doc"
-            data = json.dumps(document).encode("utf-8")
-            req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+            data = orjson.dumps(document)
 
             # Perform in a background thread to avoid blocking the event loop
             def _do_request():
-                try:
-                    with urllib.request.urlopen(req, timeout=2) as resp:
-                        # Best-effort: don't parse response
-                        _ = resp.read()
-                except Exception as e:
-                    # Suppress errors to keep chat responsive
-                    raise e
+                # Best-effort: don't parse response
+                self._es_session.post(self._es_doc_url, data=data, timeout=2)
 
             await asyncio.to_thread(_do_request)
         except Exception as e:
             # Surface minimal info to logs, but never raise
-            print(f"Elasticsearch log error: {e}")
+            logger.warning("Elasticsearch log error: %s", e)
+
+    def _enqueue_es_log(self, document: Dict) -> None:
+        """Queue a document for the Elasticsearch writers; drop it (with a warning) only when the queue is full"""
+        if not self._es_writers:
+            self._es_writers = [asyncio.create_task(self._es_writer()) for _ in range(self._es_concurrency)]
+        try:
+            self._es_queue.put_nowait(document)
+        except asyncio.QueueFull:
+            self._es_dropped += 1
+            # Rate-limited: first drop, then every 100th
+            if self._es_dropped % 100 == 1:
+                logger.warning("Elasticsearch log queue full; %d documents dropped so far", self._es_dropped)
+
+    async def _es_writer(self) -> None:
+        while True:
+            document = await self._es_queue.get()
+            await self.log_to_elasticsearch(document)
+
+    def close(self) -> None:
+        """Stop the Elasticsearch writers and release pooled HTTP connections"""
+        for task in self._es_writers:
+            task.cancel()
+        self._es_session.close()
     
     async def get_conversation_summary(self, conversation_id: str) -> Dict:
         """Get a summary of a conversation"""
@@ -979,18 +999,19 @@ Instructions:
     async def list_all_conversations(self) -> List[Dict]:
         """List all conversations in MongoDB for debugging"""
         try:
-            conversations = await self.mongo_db.conversations.find({}).sort("updated_at", -1).to_list(length=None)
-            result = []
-            for conv in conversations:
-                result.append({
-                    "conversation_id": conv.get("conversation_id"),
-                    "user_id": conv.get("user_id"),
-                    "domain": conv.get("domain"),
-                    "message_count": len(conv.get("messages", [])),
-                    "created_at": conv.get("created_at"),
-                    "updated_at": conv.get("updated_at")
-                })
-            return result
+            # Count messages in MongoDB instead of pulling every message array over the wire
+            return await self.mongo_db.conversations.aggregate([
+                {"$sort": {"updated_at": -1}},
+                {"$project": {
+                    "_id": 0,
+                    "conversation_id": 1,
+                    "user_id": 1,
+                    "domain": 1,
+                    "message_count": {"$size": {"$ifNull": ["$messages", []]}},
+                    "created_at": 1,
+                    "updated_at": 1
+                }}
+            ]).to_list(length=None)
         except Exception as e:
-            print(f"Error listing conversations: {e}")
+            logger.error("Error listing conversations: %s", e)
             return []  
@@ -1,16 +1,25 @@
 import os
 import re
+import json
+import asyncio
+import logging
 from dotenv import load_dotenv
 
 load_dotenv() 
 
-from fastapi import FastAPI, HTTPException, Depends
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 from uuid import uuid4
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import asyncpg
 from motor.motor_asyncio import AsyncIOMotorClient
 import bcrypt
@@ -23,7 +32,11 @@ from notification_service import notification_service
 from sla import sla_checker
 from sla.sla_utils import calculate_sla_deadline
 from sla.sla_routes import get_sla_router
-from redis_client import init_redis, close_redis, push_message, get_messages
+from migrate import run_migrations
+from redis_client import (
+    init_redis, get_redis, close_redis, invalidate_messages, replace_messages, push_dead_letter, get_messages_cached,
+    CHAT_MAX_MESSAGES, TICKET_MESSAGES_TTL_SECONDS,
+)
 
 # Import chatbot module
 from chatbot import GeminiChatbot, ChatQuery, ChatResponse
@@ -31,67 +44,76 @@ from chatbot import GeminiChatbot, ChatQuery, ChatResponse
 # Initialize chatbot
 chatbot = None
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
-    # PostgreSQL tables
-    pool = await get_pg_pool()
+async def create_pg_schema(pool):
+    """Apply the PostgreSQL migrations unless the deployment runs migrate.py itself"""
+    if os.getenv("RUN_MIGRATIONS", "1") == "0":
+        return
     async with pool.acquire() as conn:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS tickets (
-                ticket_id VARCHAR(36) PRIMARY KEY,
-                user_id VARCHAR(255) NOT NULL,
-                domain VARCHAR(100) NOT NULL,
-                subject TEXT NOT NULL,
-                status VARCHAR(50) DEFAULT 'In-Progress',
-                priority VARCHAR(50) NOT NULL,
-                sla_deadline TIMESTAMP NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS sla_events (
-                event_id VARCHAR(36) PRIMARY KEY,
-                ticket_id VARCHAR(36) NOT NULL,
-                event VARCHAR(100) NOT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-    await pool.close()
-
-    # Create default admin user if it doesn't exist
-    existing_admin = await mongo_db.admins.find_one({"username": "admin"})
-    if not existing_admin:
-        admin_id = str(uuid4())
-        hashed_password = hash_password("admin123")
-        admin_doc = {
-            "_id": admin_id,
-            "username": "admin",
-            "password": hashed_password,
-            "role": "admin",
-            "created_at": datetime.utcnow(),
-        }
-        await mongo_db.admins.insert_one(admin_doc)
-        print("Default admin created: username=admin, password=admin123")
+        await run_migrations(conn)
+
+
+async def ensure_default_admin():
+    """Create the default admin user if it doesn't exist (single atomic upsert)"""
+    result = await mongo_db.admins.update_one(
+        {"username": "admin"},
+        {
+            "$setOnInsert": {
+                # "username" comes from the filter on insert
+                "_id": str(uuid4()),
+                "password": DEFAULT_ADMIN_PASSWORD_HASH,
+                "role": "admin",
+                "created_at": utcnow(),
+            }
+        },
+        upsert=True,
+    )
+    if result.upserted_id is not None:
+        if DEFAULT_ADMIN_PASSWORD_HASH == _BUILTIN_ADMIN_PASSWORD_HASH:
+            logger.warning("Default admin created: username=admin with the built-in default password; change it")
+        else:
+            logger.info("Default admin created: username=admin")
+
+
+async def create_mongo_indexes():
+    """Indexes backing the sorted admin/user listings and SLA event lookups (no-op if they already exist)"""
+    await asyncio.gather(
+        mongo_db.users.create_index([("created_at", -1)]),
+        mongo_db.conversations.create_index([("updated_at", -1)]),
+        mongo_db.sla_events.create_index([("ticket_id", 1)]),
+    )
 
-    # Start SLA background task
-    await sla_checker.start_sla_checker(app, get_pg_pool, mongo_db)
 
+async def init_redis_client():
     # Initialize Redis (use port 6380 per request)
     try:
         await init_redis(host="localhost", port=6380, db=0)
         print("Redis initialized on localhost:6380")
     except Exception as e:
         print(f"Could not initialize Redis: {e}")
-    
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    # Independent startup steps run concurrently: PostgreSQL tables, default admin, Mongo indexes, Redis
+    pool = app.state.pg_pool = await create_pg_pool()
+    await asyncio.gather(
+        create_pg_schema(pool),
+        ensure_default_admin(),
+        create_mongo_indexes(),
+        init_redis_client(),
+    )
+
+    # Start SLA background task
+    sla_task = await sla_checker.start_sla_checker(app, pool, mongo_db)
+
     # Initialize chatbot
     global chatbot
     try:
-        import redis
-        redis_client = redis.Redis(host="localhost", port=6380, db=0, decode_responses=True)
+        # Share the asyncio Redis client initialized above
+        redis_client = get_redis()
         # Test Redis connection
-        redis_client.ping()
+        await redis_client.ping()
         chatbot = GeminiChatbot(mongo_db, redis_client)
         print("Chatbot initialized successfully")
     except Exception as e:
@@ -106,12 +128,28 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    # Let accepted-but-pending background writes finish before their clients are closed
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*_background_tasks, return_exceptions=True),
+            timeout=BACKGROUND_DRAIN_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Shutdown: background tasks did not finish within %ss", BACKGROUND_DRAIN_TIMEOUT)
+
     try:
         await close_redis()
         print("Redis connection closed")
     except Exception as e:
         print(f"Error closing Redis: {e}")
 
+    sla_task.cancel()
+    if chatbot:
+        chatbot.close()
+    await notification_service.close()
+    await pool.close()
+    mongo_client.close()
+
 app = FastAPI(title="Chatbot Ticket API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
@@ -123,6 +161,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+class FastHealthMiddleware:
+    """Answer health-check paths straight from ASGI, skipping routing, dependencies and other middleware"""
+
+    def __init__(self, app, paths):
+        self.app = app
+        self.paths = frozenset(paths)
+        self._body = b'{"message":"Chatbot Ticket API is running!"}'
+        self._headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._body)).encode()),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        # Only GET/HEAD: other methods (e.g. CORS preflight) still go through the middleware stack
+        if scope["type"] == "http" and scope["path"] in self.paths and scope["method"] in ("GET", "HEAD"):
+            await send({"type": "http.response.start", "status": 200, "headers": self._headers})
+            # HEAD keeps the GET headers (incl. content-length) but must not carry a body
+            await send({"type": "http.response.body", "body": self._body if scope["method"] == "GET" else b""})
+            return
+        await self.app(scope, receive, send)
+
+
+# Added last so it is the outermost middleware
+app.add_middleware(FastHealthMiddleware, paths={"/"})
+
 # Serve TTS audio files
 try:
     # Get the tts_audio directory path (in backend/tts_audio/)
@@ -138,20 +202,55 @@ except Exception as _e:
 SECRET_KEY = "yF0QdmI6zNQHvoSwuaNYFd%VfQ7Yt@$o"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# bcrypt work factor for new hashes. Existing hashes keep verifying when this changes
+# (the cost is stored in the hash) and are upgraded on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "10"))
+# Precomputed bcrypt hash of the default admin password ("admin123") so startup never hashes.
+# Set DEFAULT_ADMIN_PASSWORD_HASH to bootstrap a different password.
+_BUILTIN_ADMIN_PASSWORD_HASH = "$2b$10$HTEARs7bjgkmcIOG4DAh4Oa67vxfkRR59Kj7UK.rDRFrVy6wmrV0C"
+DEFAULT_ADMIN_PASSWORD_HASH = os.getenv("DEFAULT_ADMIN_PASSWORD_HASH", _BUILTIN_ADMIN_PASSWORD_HASH)
 security = HTTPBearer()
 
 # PostgreSQL connection
-async def get_pg_pool():
+# One pool per process, created in lifespan and stored on app.state.pg_pool; handlers only
+# acquire from it. asyncpg caches the parse/plan of each statement per connection, so the
+# hot ticket queries below are only prepared once per connection.
+async def create_pg_pool():
     return await asyncpg.create_pool(
         user="admin",
         password="adminpass",
         database="tickets",
         host="localhost",
         port=5432,
+        min_size=5,
+        max_size=20,
+        max_inactive_connection_lifetime=300,
+        command_timeout=30,
+        server_settings={"application_name": "chatbot-ticket-api"},
     )
 
-# MongoDB connection
-mongo_client = AsyncIOMotorClient("mongodb://localhost:27017")
+
+# Hot ticket statements (kept as constants so the statement cache key is identical across handlers)
+TICKET_BY_ID_SQL = "SELECT * FROM tickets WHERE ticket_id = $1"
+TICKET_INSERT_SQL = """
+    INSERT INTO tickets (ticket_id, user_id, domain, subject, status, priority, sla_deadline)
+    VALUES ($1, $2, $3, $4, 'In-Progress', $5, $6)
+"""
+# Keyset pagination over idx_tickets_created_at_id: ($1, $2) is the previous page's last
+# (created_at, ticket_id), or NULLs for the first page. ticket_id breaks created_at ties.
+TICKETS_PAGE_SQL = """
+    SELECT ticket_id, user_id, domain, subject, status, priority, sla_deadline, created_at, updated_at
+    FROM tickets
+    WHERE ($1::timestamp IS NULL OR (created_at, ticket_id) < ($1, $2::varchar))
+    ORDER BY created_at DESC, ticket_id DESC
+    LIMIT $3
+"""
+
+# MongoDB connection: one client (and pool) per process, shared with the chatbot and SLA checker
+mongo_client = AsyncIOMotorClient(
+    "mongodb://localhost:27017",
+    maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+)
 mongo_db = mongo_client["tickets_db"]
 
 # Pydantic models
@@ -246,16 +345,53 @@ class TicketResolution(BaseModel):
 
 # Helper functions
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    # bcrypt hashes look like "$2b$<rounds>$<salt+hash>"
+    try:
+        return int(hashed_password.split("$")[2]) < BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+# Strong refs to fire-and-forget tasks so the event loop can't garbage collect them mid-flight;
+# lifespan shutdown waits up to BACKGROUND_DRAIN_TIMEOUT seconds for them
+_background_tasks = set()
+BACKGROUND_DRAIN_TIMEOUT = float(os.getenv("BACKGROUND_DRAIN_TIMEOUT", "10"))
+
+
+def spawn_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def upgrade_password_hash(collection, doc_id: str, password: str):
+    """Re-hash a password at the current BCRYPT_ROUNDS; run in the background after login"""
+    try:
+        new_hash = await asyncio.to_thread(hash_password, password)
+        await collection.update_one({"_id": doc_id}, {"$set": {"password": new_hash}})
+    except Exception:
+        logger.exception("Failed to upgrade password hash for %s", doc_id)
+
+
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime (matches the TIMESTAMP columns and stored Mongo dates).
+    Replaces the deprecated datetime.utcnow().
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=15))
+    expire = utcnow() + (expires_delta if expires_delta else timedelta(minutes=15))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
@@ -306,7 +442,7 @@ async def root():
 
 
 # -------------------- Include SLA routes --------------------
-app.include_router(get_sla_router(get_pg_pool, mongo_db))
+app.include_router(get_sla_router(mongo_db))
 
 
 # -------------------- Chatbot AI Routes --------------------
@@ -470,13 +606,15 @@ async def get_dynamic_faqs(
         domain_name = domain_mapping.get(domain, domain)
 
         # Gather recent user questions across this user's conversations in this domain
-        recent_conversations = await mongo_db.conversations.find(
-            {"user_id": current_user.id, "domain": domain_name}
-        ).sort("updated_at", -1).limit(10).to_list(length=None)
+        # Stream the cursor and only fetch the last 20 messages of each conversation
+        recent_conversations = mongo_db.conversations.find(
+            {"user_id": current_user.id, "domain": domain_name},
+            {"_id": 0, "messages": {"$slice": -20}},
+        ).sort("updated_at", -1).limit(10)
 
         user_questions = []
-        for conv in recent_conversations:
-            for msg in conv.get("messages", [])[-20:]:  # last 20 per conversation
+        async for conv in recent_conversations:
+            for msg in conv.get("messages", []):  # last 20 per conversation
                 if msg.get("role") == "user" and msg.get("content"):
                     user_questions.append(msg["content"]) 
 
@@ -616,10 +754,9 @@ async def get_dynamic_faqs(
 async def test_admin_connections():
     try:
         # Test PostgreSQL
-        pool = await get_pg_pool()
+        pool = app.state.pg_pool
         async with pool.acquire() as conn:
             ticket_count = await conn.fetchval("SELECT COUNT(*) FROM tickets")
-        await pool.close()
 
         # Test MongoDB
         user_count = await mongo_db.users.count_documents({})
@@ -652,7 +789,7 @@ async def register_user(user: UserCreate):
             "email": user.email,
             "password": hashed_password,
             "name": user.name,
-            "created_at": datetime.utcnow(),
+            "created_at": utcnow(),
         }
         await mongo_db.users.insert_one(user_doc)
 
@@ -687,6 +824,9 @@ async def login_user(user_credentials: UserLogin):
         if not verify_password(user_credentials.password, user["password"]):
             raise HTTPException(status_code=401, detail="Invalid email or password")
 
+        if password_needs_rehash(user["password"]):
+            spawn_background(upgrade_password_hash(mongo_db.users, user["_id"], user_credentials.password))
+
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
             data={"sub": user["_id"]}, expires_delta=access_token_expires
@@ -714,19 +854,28 @@ async def get_current_user_info(current_user: UserResponse = Depends(get_current
 
 
 # Ticket routes
+async def save_ticket_message(message_doc: dict):
+    """Write a ticket message to MongoDB, then invalidate its cached Redis list.
+    Invalidating only after the insert means the next read-miss sees the message.
+    A Redis failure is only logged; a MongoDB failure is raised to the caller.
+    """
+    await mongo_db.ticket_messages.insert_one(message_doc)
+    try:
+        await invalidate_messages(message_doc["ticket_id"])
+    except Exception:
+        logger.warning("Redis invalidation failed for ticket %s", message_doc["ticket_id"], exc_info=True)
+
+
 @app.post("/api/tickets", response_model=TicketResponse)
 async def create_ticket(ticket: TicketCreate):
     try:
         ticket_id = str(uuid4())
         deadline = calculate_sla_deadline(ticket.priority)
 
-        pool = await get_pg_pool()
+        pool = app.state.pg_pool
         async with pool.acquire() as conn:
             await conn.execute(
-                """
-                INSERT INTO tickets (ticket_id, user_id, domain, subject, status, priority, sla_deadline)
-                VALUES ($1, $2, $3, $4, 'In-Progress', $5, $6)
-            """,
+                TICKET_INSERT_SQL,
                 ticket_id,
                 ticket.user_id,
                 ticket.domain,
@@ -734,13 +883,12 @@ async def create_ticket(ticket: TicketCreate):
                 ticket.priority,
                 deadline,
             )
-        await pool.close()
 
-        await mongo_db.ticket_messages.insert_one({
+        await save_ticket_message({
             "ticket_id": ticket_id,
             "message": ticket.summary,
             "sender": "user",
-            "created_at": datetime.utcnow(),
+            "created_at": utcnow(),
             "metadata": {
                 "domain": ticket.domain,
                 "priority": ticket.priority,
@@ -748,25 +896,6 @@ async def create_ticket(ticket: TicketCreate):
             },
         })
 
-        # Also store the message in Redis for fast access / chat storage
-        try:
-            await push_message(
-                ticket_id,
-                {
-                    "ticket_id": ticket_id,
-                    "message": ticket.summary,
-                    "sender": "user",
-                    "created_at": datetime.utcnow().isoformat(),
-                    "metadata": {
-                        "domain": ticket.domain,
-                        "priority": ticket.priority,
-                        "user_id": ticket.user_id,
-                    },
-                },
-            )
-        except Exception as e:
-            print(f"Warning: failed to push message to Redis: {e}")
-
         return TicketResponse(
             ticket_id=ticket_id,
             status="created",
@@ -780,10 +909,9 @@ async def create_ticket(ticket: TicketCreate):
 @app.get("/api/tickets/{ticket_id}")
 async def get_ticket(ticket_id: str):
     try:
-        pool = await get_pg_pool()
+        pool = app.state.pg_pool
         async with pool.acquire() as conn:
-            row = await conn.fetchrow("SELECT * FROM tickets WHERE ticket_id = $1", ticket_id)
-        await pool.close()
+            row = await conn.fetchrow(TICKET_BY_ID_SQL, ticket_id)
 
         if not row:
             raise HTTPException(status_code=404, detail="Ticket not found")
@@ -805,6 +933,9 @@ async def admin_login(admin_credentials: AdminLogin):
         if not verify_password(admin_credentials.password, admin["password"]):
             raise HTTPException(status_code=401, detail="Invalid username or password")
 
+        if password_needs_rehash(admin["password"]):
+            spawn_background(upgrade_password_hash(mongo_db.admins, admin["_id"], admin_credentials.password))
+
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -834,26 +965,42 @@ async def get_current_admin_info(current_admin: AdminResponse = Depends(get_curr
 
 
 @app.get("/api/admin/tickets")
-async def get_all_tickets(current_admin: AdminResponse = Depends(get_current_admin)):
+async def get_all_tickets(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_admin: AdminResponse = Depends(get_current_admin),
+):
+    """Return one page of tickets, newest first. Pass `next_cursor` back as `cursor` for the next page."""
+    cursor_created_at, cursor_ticket_id = None, None
+    if cursor:
+        # Opaque "<created_at ISO>|<ticket_id>" token produced below
+        try:
+            created_at_str, cursor_ticket_id = cursor.split("|", 1)
+            cursor_created_at = datetime.fromisoformat(created_at_str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # created_at is a naive UTC TIMESTAMP; asyncpg can't bind an aware value to it
+        if cursor_created_at.tzinfo is not None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     try:
         # First try to get tickets from PostgreSQL
-        pool = await get_pg_pool()
+        pool = app.state.pg_pool
         async with pool.acquire() as conn:
-            rows = await conn.fetch("""
-                SELECT * FROM tickets
-                ORDER BY created_at DESC
-            """)
-        await pool.close()
+            rows = await conn.fetch(TICKETS_PAGE_SQL, cursor_created_at, cursor_ticket_id, limit)
+
+        # Fetch all ticket owners in one query, but don't fail if it doesn't work
+        users = {}
+        try:
+            user_ids = list({row["user_id"] for row in rows})
+            async for user in mongo_db.users.find({"_id": {"$in": user_ids}}, {"name": 1, "email": 1}):
+                users[user["_id"]] = user
+        except Exception:
+            logger.warning("Could not fetch ticket users", exc_info=True)
 
         tickets = []
         for row in rows:
-            # Try to get user info from MongoDB, but don't fail if it doesn't work
-            user = None
-            try:
-                user = await mongo_db.users.find_one({"_id": row["user_id"]})
-            except Exception as user_error:
-                print(f"Could not fetch user {row['user_id']}: {user_error}")
-
+            user = users.get(row["user_id"])
             tickets.append(
                 {
                     "ticket_id": str(row["ticket_id"]),
@@ -876,12 +1023,15 @@ async def get_all_tickets(current_admin: AdminResponse = Depends(get_current_adm
                 }
             )
 
-        return tickets
+        return {
+            "tickets": tickets,
+            "next_cursor": f"{rows[-1]['created_at'].isoformat()}|{rows[-1]['ticket_id']}" if rows else None,
+        }
 
     except Exception as e:
         print(f"Error in get_all_tickets: {str(e)}")  # Debug print
-        # Return empty list instead of error for now
-        return []
+        # Return empty page instead of error for now
+        return {"tickets": [], "next_cursor": None}
 
 
 # Helper to fix ObjectId in a list of MongoDB documents
@@ -895,16 +1045,9 @@ def fix_objectid_list(docs):
 @app.get("/api/admin/tickets/{ticket_id}")
 async def get_ticket_details(ticket_id: str, current_admin: AdminResponse = Depends(get_current_admin)):
     try:
-        pool = await get_pg_pool()
+        pool = app.state.pg_pool
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(
-                """
-                SELECT * FROM tickets
-                WHERE ticket_id = $1
-            """,
-                ticket_id,
-            )
-        await pool.close()
+            row = await conn.fetchrow(TICKET_BY_ID_SQL, ticket_id)
 
         if not row:
             raise HTTPException(status_code=404, detail="Ticket not found")
@@ -916,27 +1059,41 @@ async def get_ticket_details(ticket_id: str, current_admin: AdminResponse = Depe
         except Exception as user_error:
             print(f"Could not fetch user {row['user_id']}: {user_error}")
 
-        # Try to get ticket messages from MongoDB
+        # Cache-aside: serve messages from Redis, only hit MongoDB on a miss
         messages = []
         try:
-            messages = await mongo_db.ticket_messages.find({"ticket_id": ticket_id}).sort(
-                "created_at", 1
-            ).to_list(length=None)
-            messages = fix_objectid_list(messages)
-        except Exception as msg_error:
-            print(f"Could not fetch messages for ticket {ticket_id}: {msg_error}")
-
-        # Also attempt to fetch messages from Redis and merge (Redis messages are stored as dicts)
-        redis_messages = []
-        try:
-            redis_messages = await get_messages(ticket_id)
+            messages = await get_messages_cached(ticket_id)
         except Exception as redis_err:
             print(f"Could not fetch Redis messages for ticket {ticket_id}: {redis_err}")
 
-        # Merge messages: prefer Redis messages (fast), fall back to MongoDB if Redis is empty
-        if redis_messages:
-            # Redis messages already have ISO timestamps and are dicts
-            messages = redis_messages
+        if not messages:
+            try:
+                # Newest CHAT_MAX_MESSAGES, returned oldest-first
+                docs = await mongo_db.ticket_messages.find({"ticket_id": ticket_id}).sort(
+                    "created_at", -1
+                ).limit(CHAT_MAX_MESSAGES).to_list(length=CHAT_MAX_MESSAGES)
+                docs.reverse()
+                messages = fix_objectid_list(docs)
+            except Exception as msg_error:
+                print(f"Could not fetch messages for ticket {ticket_id}: {msg_error}")
+
+            # Warm Redis so the next read is a hit. Writers invalidate rather than append, and the
+            # short TTL bounds how long a warm that raced with an invalidation can serve stale data
+            if messages:
+                try:
+                    await replace_messages(
+                        ticket_id,
+                        [
+                            {**m, "created_at": m["created_at"].isoformat()}
+                            if isinstance(m.get("created_at"), datetime)
+                            else m
+                            for m in messages
+                        ],
+                        ttl=TICKET_MESSAGES_TTL_SECONDS,
+                        max_len=CHAT_MAX_MESSAGES,
+                    )
+                except Exception:
+                    logger.warning("Could not warm Redis messages for ticket %s", ticket_id, exc_info=True)
 
         return {
             "ticket_id": str(row["ticket_id"]),
@@ -965,7 +1122,7 @@ async def update_ticket(
     ticket_id: str, ticket_update: TicketUpdate, current_admin: AdminResponse = Depends(get_current_admin)
 ):
     try:
-        pool = await get_pg_pool()
+        pool = app.state.pg_pool
 
         # Build update query dynamically
         update_fields = []
@@ -1005,39 +1162,21 @@ async def update_ticket(
             """,
                 *params,
             )
-        await pool.close()
 
-        # Add admin note to MongoDB if provided
+        # Add admin note to MongoDB and Redis if provided
         if ticket_update.notes:
-            await mongo_db.ticket_messages.insert_one(
+            await save_ticket_message(
                 {
                     "ticket_id": ticket_id,
                     "message": f"[Admin Note] {ticket_update.notes}",
                     "sender": "admin",
-                    "created_at": datetime.utcnow(),
+                    "created_at": utcnow(),
                     "metadata": {
                         "admin_id": current_admin.id,
                         "admin_username": current_admin.username,
                     },
                 }
             )
-            # Also push admin note to Redis
-            try:
-                await push_message(
-                    ticket_id,
-                    {
-                        "ticket_id": ticket_id,
-                        "message": f"[Admin Note] {ticket_update.notes}",
-                        "sender": "admin",
-                        "created_at": datetime.utcnow().isoformat(),
-                        "metadata": {
-                            "admin_id": current_admin.id,
-                            "admin_username": current_admin.username,
-                        },
-                    },
-                )
-            except Exception as e:
-                print(f"Warning: failed to push admin note to Redis: {e}")
 
         # Send resolution email if ticket resolved
         if ticket_update.status and ticket_update.status.lower() == "resolved" and user_id:
@@ -1067,13 +1206,11 @@ async def update_ticket(
 async def admin_resolve_ticket(ticket_id: str, resolution: TicketResolution, current_admin: AdminResponse = Depends(get_current_admin)):
     """Admin endpoint to resolve a ticket and send notification to user"""
     try:
-        pool = await get_pg_pool()
+        pool = app.state.pg_pool
         
         # First, get the ticket details
         async with pool.acquire() as conn:
-            ticket_row = await conn.fetchrow("""
-                SELECT * FROM tickets WHERE ticket_id = $1
-            """, ticket_id)
+            ticket_row = await conn.fetchrow(TICKET_BY_ID_SQL, ticket_id)
         
         if not ticket_row:
             raise HTTPException(status_code=404, detail="Ticket not found")
@@ -1095,14 +1232,12 @@ async def admin_resolve_ticket(ticket_id: str, resolution: TicketResolution, cur
                 VALUES ($1, $2, $3, NOW())
             """, str(uuid4()), ticket_id, "Ticket Resolved by Admin")
         
-        await pool.close()
-        
-        # Add resolution message to MongoDB
-        await mongo_db.ticket_messages.insert_one({
+        # Add resolution message to MongoDB and Redis
+        await save_ticket_message({
             "ticket_id": ticket_id,
             "message": f"[ADMIN] Ticket resolved by {current_admin.username}" + (f"\nResolution Notes: {resolution.resolution_notes}" if resolution.resolution_notes else ""),
             "sender": "admin",
-            "created_at": datetime.utcnow(),
+            "created_at": utcnow(),
             "metadata": {
                 "event_type": "admin_resolution",
                 "admin_id": current_admin.id,
@@ -1138,38 +1273,41 @@ async def admin_resolve_ticket(ticket_id: str, resolution: TicketResolution, cur
         raise HTTPException(status_code=500, detail=f"Failed to resolve ticket: {str(e)}")
 
 
-@app.post("/api/chat/messages")
-async def save_chat_message(msg: ChatMessageIn):
-    """Accept a chat message from frontend, persist to MongoDB (historical) and push to Redis list for fast access."""
-    try:
-        created_at = datetime.utcnow()
-        # Persist to MongoDB
-        await mongo_db.ticket_messages.insert_one({
-            "ticket_id": msg.ticket_id,
-            "message": msg.message,
-            "sender": msg.sender,
-            "created_at": created_at,
-            "metadata": msg.metadata or {},
-        })
+# Chat messages are persisted off the request path. A slot is taken before the task is
+# spawned, so at most CHAT_PERSIST_CONCURRENCY writes are pending; beyond that requests get 503.
+CHAT_PERSIST_CONCURRENCY = int(os.getenv("CHAT_PERSIST_CONCURRENCY", "100"))
+_chat_persist_semaphore = asyncio.Semaphore(CHAT_PERSIST_CONCURRENCY)
 
-        # Push to Redis for fast retrieval
+
+async def _persist_chat_message(message_doc: dict):
+    """Write a chat message in the background; the caller has already acquired _chat_persist_semaphore"""
+    try:
+        await save_ticket_message(message_doc)
+    except Exception:
+        logger.exception("Failed to persist chat message for ticket %s", message_doc["ticket_id"])
         try:
-            await push_message(
-                msg.ticket_id,
-                {
-                    "ticket_id": msg.ticket_id,
-                    "message": msg.message,
-                    "sender": msg.sender,
-                    "created_at": created_at.isoformat(),
-                    "metadata": msg.metadata or {},
-                },
-            )
-        except Exception as e:
-            print(f"Warning: failed to push message to Redis: {e}")
+            await push_dead_letter(message_doc)
+        except Exception:
+            logger.exception("Failed to dead-letter chat message for ticket %s", message_doc["ticket_id"])
+    finally:
+        _chat_persist_semaphore.release()
 
-        return {"status": "ok"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save chat message: {str(e)}")
+
+@app.post("/api/chat/messages", status_code=202)
+async def save_chat_message(msg: ChatMessageIn):
+    """Accept a chat message from frontend; MongoDB (historical) and Redis (fast access) writes happen in the background."""
+    if _chat_persist_semaphore.locked():
+        raise HTTPException(status_code=503, detail="Too many pending chat messages, please retry")
+    # Doesn't wait: a slot is free and nothing yields between the check and the acquire
+    await _chat_persist_semaphore.acquire()
+    spawn_background(_persist_chat_message({
+        "ticket_id": msg.ticket_id,
+        "message": msg.message,
+        "sender": msg.sender,
+        "created_at": utcnow(),
+        "metadata": msg.metadata or {},
+    }))
+    return {"status": "accepted"}
 
 
 from bson import ObjectId
@@ -1187,18 +1325,21 @@ async def get_all_users(current_admin: AdminResponse = Depends(get_current_admin
     try:
         users = await mongo_db.users.find({}, {"password": 0}).sort("created_at", -1).to_list(length=None)
 
-        # Get ticket counts for each user
-        pool = await get_pg_pool()
+        # Get ticket counts for all users in one query
+        pool = app.state.pg_pool
         async with pool.acquire() as conn:
-            for user in users:
-                ticket_count = await conn.fetchval(
-                    """
-                    SELECT COUNT(*) FROM tickets WHERE user_id = $1
-                """,
-                    user["_id"],
-                )
-                user["ticket_count"] = ticket_count
-        await pool.close()
+            rows = await conn.fetch(
+                """
+                SELECT user_id, COUNT(*) AS ticket_count
+                FROM tickets
+                WHERE user_id = ANY($1::text[])
+                GROUP BY user_id
+            """,
+                [user["_id"] for user in users],
+            )
+        ticket_counts = {row["user_id"]: row["ticket_count"] for row in rows}
+        for user in users:
+            user["ticket_count"] = ticket_counts.get(user["_id"], 0)
 
         # Fix ObjectId for all users
         users = [fix_objectid(user) for user in users]
@@ -1208,61 +1349,42 @@ async def get_all_users(current_admin: AdminResponse = Depends(get_current_admin
         raise HTTPException(status_code=500, detail=f"Failed to retrieve users: {str(e)}")
 
 
+ADMIN_STATS_SQL = """
+    SELECT
+        COUNT(*) AS total_tickets,
+        COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '7 days') AS recent_tickets,
+        (SELECT COALESCE(jsonb_object_agg(status, c), '{}'::jsonb)
+           FROM (SELECT COALESCE(status, 'Unknown') AS status, COUNT(*) AS c FROM tickets GROUP BY 1) s
+        ) AS status_breakdown,
+        (SELECT COALESCE(jsonb_object_agg(priority, c), '{}'::jsonb)
+           FROM (SELECT priority, COUNT(*) AS c FROM tickets GROUP BY priority) p
+        ) AS priority_breakdown,
+        (SELECT COALESCE(jsonb_object_agg(domain, c), '{}'::jsonb)
+           FROM (SELECT domain, COUNT(*) AS c FROM tickets GROUP BY domain) d
+        ) AS domain_breakdown
+    FROM tickets
+"""
+
+
 @app.get("/api/admin/stats")
 async def get_admin_stats(current_admin: AdminResponse = Depends(get_current_admin)):
     try:
-        pool = await get_pg_pool()
+        pool = app.state.pg_pool
         async with pool.acquire() as conn:
-            # Total tickets
-            total_tickets = await conn.fetchval("SELECT COUNT(*) FROM tickets")
-
-            # Tickets by status
-            status_counts = await conn.fetch(
-                """
-                SELECT status, COUNT(*) as count 
-                FROM tickets 
-                GROUP BY status
-            """
-            )
-
-            # Tickets by priority
-            priority_counts = await conn.fetch(
-                """
-                SELECT priority, COUNT(*) as count 
-                FROM tickets 
-                GROUP BY priority
-            """
-            )
-
-            # Tickets by domain
-            domain_counts = await conn.fetch(
-                """
-                SELECT domain, COUNT(*) as count 
-                FROM tickets 
-                GROUP BY domain
-            """
-            )
-
-            # Recent tickets (last 7 days)
-            recent_tickets = await conn.fetchval(
-                """
-                SELECT COUNT(*) FROM tickets 
-                WHERE created_at >= NOW() - INTERVAL '7 days'
-            """
-            )
-
-        await pool.close()
+            # All ticket aggregates in one round trip
+            stats_row = await conn.fetchrow(ADMIN_STATS_SQL)
 
         # Total users
         total_users = await mongo_db.users.count_documents({})
 
         return {
-            "total_tickets": total_tickets,
+            "total_tickets": stats_row["total_tickets"],
             "total_users": total_users,
-            "recent_tickets": recent_tickets,
-            "status_breakdown": {row["status"]: row["count"] for row in status_counts},
-            "priority_breakdown": {row["priority"]: row["count"] for row in priority_counts},
-            "domain_breakdown": {row["domain"]: row["count"] for row in domain_counts},
+            "recent_tickets": stats_row["recent_tickets"],
+            # jsonb columns come back from asyncpg as JSON text
+            "status_breakdown": json.loads(stats_row["status_breakdown"]),
+            "priority_breakdown": json.loads(stats_row["priority_breakdown"]),
+            "domain_breakdown": json.loads(stats_row["domain_breakdown"]),
         }
 
     except Exception as e:
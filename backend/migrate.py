@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL schema migrations for the ticket API.
+
+Run once per deployment before starting the API workers:
+
+    python migrate.py
+
+The API also calls run_migrations() at startup unless RUN_MIGRATIONS=0, so
+local development keeps working without a separate step.
+"""
+
+import asyncio
+import asyncpg
+
+# Arbitrary application-wide key; serializes concurrent migration runs (e.g. uvicorn --workers N)
+MIGRATION_LOCK_KEY = 4242
+
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS tickets (
+        ticket_id VARCHAR(36) PRIMARY KEY,
+        user_id VARCHAR(255) NOT NULL,
+        domain VARCHAR(100) NOT NULL,
+        subject TEXT NOT NULL,
+        status VARCHAR(50) DEFAULT 'In-Progress',
+        priority VARCHAR(50) NOT NULL,
+        sla_deadline TIMESTAMP NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sla_events (
+        event_id VARCHAR(36) PRIMARY KEY,
+        ticket_id VARCHAR(36) NOT NULL,
+        event VARCHAR(100) NOT NULL,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tickets_user_id ON tickets (user_id)",
+    # Only open tickets, ordered by deadline: the SLA checker scans O(breached), not the whole table
+    """
+    CREATE INDEX IF NOT EXISTS idx_tickets_open_sla_deadline
+    ON tickets (sla_deadline) WHERE status = 'In-Progress'
+    """,
+    # Keyset pagination on (created_at, ticket_id); supersedes idx_tickets_created_at
+    "CREATE INDEX IF NOT EXISTS idx_tickets_created_at_id ON tickets (created_at DESC, ticket_id DESC)",
+    "DROP INDEX IF EXISTS idx_tickets_created_at",
+]
+
+
+async def run_migrations(conn):
+    """Apply all migrations in one transaction, holding an advisory lock so only one process runs DDL at a time"""
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", MIGRATION_LOCK_KEY)
+        for statement in MIGRATIONS:
+            await conn.execute(statement)
+
+
+async def main():
+    conn = await asyncpg.connect(
+        user="admin",
+        password="adminpass",
+        database="tickets",
+        host="localhost",
+        port=5432,
+    )
+    try:
+        await run_migrations(conn)
+        print("✅ PostgreSQL migrations applied")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
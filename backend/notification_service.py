@@ -1,54 +1,33 @@
+import asyncio
+import logging
 import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Template
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache
 import os
+import html
+import tempfile
 from typing import Optional
 
-class NotificationService:
-    def __init__(self):
-        # Email configuration - you can set these via environment variables
-        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        self.smtp_username = os.getenv("SMTP_USERNAME", "")
-        self.smtp_password = os.getenv("SMTP_PASSWORD", "")
-        self.from_email = os.getenv("FROM_EMAIL", "noreply@support.com")
-        self.from_name = os.getenv("FROM_NAME", "Customer Support")
-        
-        print(f"DEBUG: SMTP_USERNAME={self.smtp_username}, SMTP_PASSWORD={'SET' if self.smtp_password else 'NOT SET'}")
-        
-    async def send_ticket_resolved_notification(self, user_email: str, user_name: str, ticket_id: str, resolution_notes: str = ""):
-        """Send email notification when a ticket is resolved"""
-        try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = user_email
-            msg['Subject'] = f"Ticket #{ticket_id} - Resolved"
-            
-            # Email template
-            template = Template("""
+logger = logging.getLogger(__name__)
+
+# Resolution email (hot path): static HTML skeleton filled with str.format_map, no template engine.
+# Values are escaped with html.escape to match Jinja autoescape.
+RESOLVED_SKELETON = """
             <html>
             <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
                 <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
                     <h2 style="color: #2c5aa0;">Ticket Resolved</h2>
                     
-                    <p>Dear {{ user_name }},</p>
+                    <p>Dear {user_name},</p>
                     
                     <p>We're pleased to inform you that your support ticket has been resolved.</p>
                     
                     <div style="background-color: #f8f9fa; padding: 15px; border-left: 4px solid #28a745; margin: 20px 0;">
-                        <strong>Ticket ID:</strong> {{ ticket_id }}<br>
+                        <strong>Ticket ID:</strong> {ticket_id}<br>
                         <strong>Status:</strong> <span style="color: #28a745;">Resolved</span>
                     </div>
-                    
-                    {% if resolution_notes %}
-                    <div style="background-color: #e9ecef; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                        <strong>Resolution Notes:</strong><br>
-                        {{ resolution_notes }}
-                    </div>
-                    {% endif %}
-                    
+                    {notes_block}
                     <p>If you have any further questions or concerns, please don't hesitate to create a new support ticket.</p>
                     
                     <p>Thank you for your patience and for choosing our services.</p>
@@ -60,47 +39,17 @@ class NotificationService:
                 </div>
             </body>
             </html>
-            """)
-            
-            # Render template
-            html_content = template.render(
-                user_name=user_name,
-                ticket_id=ticket_id,
-                resolution_notes=resolution_notes
-            )
-            
-            # Attach HTML content
-            msg.attach(MIMEText(html_content, 'html'))
-            
-            # Send email
-            if self.smtp_username and self.smtp_password:
-                await aiosmtplib.send(
-                    msg,
-                    hostname=self.smtp_server,
-                    port=self.smtp_port,
-                    start_tls=True,
-                    username=self.smtp_username,
-                    password=self.smtp_password
-                )
-                print(f"✅ Resolution notification sent to {user_email}")
-                return True
-            else:
-                print(f"⚠ Email not configured - would send to {user_email}: Ticket #{ticket_id} resolved")
-                return True
-                
-        except Exception as e:
-            print(f"❌ Failed to send notification to {user_email}: {str(e)}")
-            return False
-    
-    async def send_ticket_breach_notification(self, user_email: str, user_name: str, ticket_id: str):
-        """Send email notification when a ticket SLA is breached"""
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = user_email
-            msg['Subject'] = f"Ticket #{ticket_id} - SLA Breach Alert"
-            
-            template = Template("""
+            """
+
+RESOLVED_NOTES_HTML = """
+                    <div style="background-color: #e9ecef; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                        <strong>Resolution Notes:</strong><br>
+                        {notes}
+                    </div>
+                    """
+
+# Breach email source, compiled by NotificationService's Jinja environment
+BREACH_SRC = """
             <html>
             <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
                 <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
@@ -126,9 +75,112 @@ class NotificationService:
                 </div>
             </body>
             </html>
-            """)
+            """
+
+# Compiled templates are persisted here so restarted workers skip the Jinja parse/compile
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "jinja_cache"))
+
+
+class NotificationService:
+    def __init__(self):
+        # Email configuration - you can set these via environment variables
+        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        self.smtp_username = os.getenv("SMTP_USERNAME", "")
+        self.smtp_password = os.getenv("SMTP_PASSWORD", "")
+        self.from_email = os.getenv("FROM_EMAIL", "noreply@support.com")
+        self.from_name = os.getenv("FROM_NAME", "Customer Support")
+        
+        os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+        self.env = Environment(
+            loader=DictLoader({"breach": BREACH_SRC}),
+            autoescape=True,
+            bytecode_cache=FileSystemBytecodeCache(JINJA_CACHE_DIR),
+        )
+        
+        # Long-lived SMTP session shared by all sends (connect + STARTTLS + AUTH once)
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._smtp_lock = asyncio.Lock()
+        
+        logger.debug("SMTP_USERNAME=%s, SMTP_PASSWORD=%s", self.smtp_username, "SET" if self.smtp_password else "NOT SET")
+        
+    async def _get_smtp(self) -> aiosmtplib.SMTP:
+        """Return the connected SMTP session, (re)connecting and logging in if needed"""
+        if self._smtp is None or not self._smtp.is_connected:
+            smtp = aiosmtplib.SMTP(hostname=self.smtp_server, port=self.smtp_port, start_tls=True)
+            await smtp.connect()
+            try:
+                await smtp.login(self.smtp_username, self.smtp_password)
+            except Exception:
+                # Don't leak the socket connect() opened when AUTH fails
+                smtp.close()
+                raise
+            self._smtp = smtp
+        return self._smtp
+    
+    async def _send(self, msg):
+        """Send over the shared session; reconnect once if the server dropped it"""
+        async with self._smtp_lock:
+            smtp = await self._get_smtp()
+            try:
+                await smtp.send_message(msg)
+            except aiosmtplib.SMTPServerDisconnected:
+                self._smtp = None
+                smtp = await self._get_smtp()
+                await smtp.send_message(msg)
+    
+    async def close(self):
+        """Close the shared SMTP session"""
+        async with self._smtp_lock:
+            if self._smtp is not None and self._smtp.is_connected:
+                try:
+                    await self._smtp.quit()
+                except aiosmtplib.SMTPException:
+                    self._smtp.close()
+            self._smtp = None
+        
+    async def send_ticket_resolved_notification(self, user_email: str, user_name: str, ticket_id: str, resolution_notes: str = ""):
+        """Send email notification when a ticket is resolved"""
+        try:
+            # Create message
+            msg = MIMEMultipart()
+            msg['From'] = f"{self.from_name} <{self.from_email}>"
+            msg['To'] = user_email
+            msg['Subject'] = f"Ticket #{ticket_id} - Resolved"
+            
+            # Render template
+            notes_block = RESOLVED_NOTES_HTML.format(notes=html.escape(resolution_notes)) if resolution_notes else ""
+            html_content = RESOLVED_SKELETON.format_map({
+                "user_name": html.escape(user_name),
+                "ticket_id": html.escape(ticket_id),
+                "notes_block": notes_block,
+            })
+            
+            # Attach HTML content
+            msg.attach(MIMEText(html_content, 'html'))
+            
+            # Send email
+            if self.smtp_username and self.smtp_password:
+                await self._send(msg)
+                logger.info("Resolution notification sent to %s", user_email)
+                return True
+            else:
+                logger.warning("Email not configured - would send to %s: Ticket #%s resolved", user_email, ticket_id)
+                return True
+                
+        except Exception as e:
+            logger.error("Failed to send notification to %s: %s", user_email, e)
+            return False
+    
+    async def send_ticket_breach_notification(self, user_email: str, user_name: str, ticket_id: str):
+        """Send email notification when a ticket SLA is breached"""
+        try:
+            msg = MIMEMultipart()
+            msg['From'] = f"{self.from_name} <{self.from_email}>"
+            msg['To'] = user_email
+            msg['Subject'] = f"Ticket #{ticket_id} - SLA Breach Alert"
             
-            html_content = template.render(
+            html_content = self.env.get_template("breach").render(
                 user_name=user_name,
                 ticket_id=ticket_id
             )
@@ -136,22 +188,15 @@ class NotificationService:
             msg.attach(MIMEText(html_content, 'html'))
             
             if self.smtp_username and self.smtp_password:
-                await aiosmtplib.send(
-                    msg,
-                    hostname=self.smtp_server,
-                    port=self.smtp_port,
-                    start_tls=True,
-                    username=self.smtp_username,
-                    password=self.smtp_password
-                )
-                print(f"✅ Breach notification sent to {user_email}")
+                await self._send(msg)
+                logger.info("Breach notification sent to %s", user_email)
                 return True
             else:
-                print(f"⚠ Email not configured - would send breach alert to {user_email}: Ticket #{ticket_id}")
+                logger.warning("Email not configured - would send breach alert to %s: Ticket #%s", user_email, ticket_id)
                 return True
                 
         except Exception as e:
-            print(f"❌ Failed to send breach notification to {user_email}: {str(e)}")
+            logger.error("Failed to send breach notification to %s: %s", user_email, e)
             return False
 
 # Global notification service instance
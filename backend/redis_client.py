@@ -1,26 +1,74 @@
-import redis
-import json
-import asyncio
+import os
+import orjson
+from redis.asyncio import Redis
+from cachetools import TTLCache
 
 r = None
 
+# Ticket chat:{id} lists keep only the newest N messages; all chat:{id} lists expire after inactivity
+CHAT_MAX_MESSAGES = int(os.getenv("REDIS_CHAT_MAX_MESSAGES", "500"))
+CHAT_TTL_SECONDS = int(os.getenv("REDIS_CHAT_TTL_SECONDS", str(7 * 24 * 3600)))
+# Warmed ticket lists live briefly so a warm racing with an invalidation can't stay stale for long
+TICKET_MESSAGES_TTL_SECONDS = int(os.getenv("REDIS_TICKET_MESSAGES_TTL_SECONDS", "300"))
+
+DEAD_LETTER_KEY = "dead_letter:chat_messages"
+
+# Small in-process L1 cache in front of Redis for hot message lists (per worker)
+_messages_cache = TTLCache(maxsize=1024, ttl=5)
+
 async def init_redis(host='localhost', port=6379, db=0):
     global r
-    # Initialize synchronously but expose as async to be awaitable
-    r = redis.Redis(host=host, port=port, db=db, decode_responses=True)
+    # Native asyncio client: commands don't block the event loop or need a worker thread.
+    # Values are orjson bytes, so responses are not decoded.
+    r = Redis(host=host, port=port, db=db, max_connections=50)
+    return r
+
+def get_redis():
     return r
 
 async def close_redis():
     global r
     if r:
-        await asyncio.to_thread(r.close)
+        await r.aclose()
+
+async def invalidate_messages(user_id):
+    """Drop a cached message list after its source of truth changed; the next read rebuilds it.
+    Appending instead could leave a partial list (expired key) or lose the message to a
+    concurrent warm that read MongoDB just before the insert.
+    """
+    await r.delete(f"chat:{user_id}")
+    _messages_cache.pop(user_id, None)
 
-async def push_message(user_id, message_dict):
+async def replace_messages(user_id, message_dicts, ttl=None, max_len=None):
+    """Replace the whole message list in one pipelined round trip (DEL + RPUSH + EXPIRE).
+    max_len keeps only the newest entries; leave it unset for lists callers treat as the full
+    history (the chatbot writes its cached conversation back to MongoDB).
+    """
     key = f"chat:{user_id}"
-    data = json.dumps(message_dict)
-    await asyncio.to_thread(r.rpush, key, data)
+    if max_len is not None:
+        message_dicts = message_dicts[-max_len:]
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.delete(key)
+        if message_dicts:
+            pipe.rpush(key, *[orjson.dumps(m) for m in message_dicts])
+            pipe.expire(key, ttl or CHAT_TTL_SECONDS)
+        await pipe.execute()
+    _messages_cache.pop(user_id, None)
+
+async def push_dead_letter(doc):
+    """Park a message whose background persistence failed so it can be replayed later"""
+    await r.rpush(DEAD_LETTER_KEY, orjson.dumps(doc, default=str))
 
 async def get_messages(user_id):
     key = f"chat:{user_id}"
-    messages = await asyncio.to_thread(r.lrange, key, 0, -1)
-    return [json.loads(m) for m in messages]
+    messages = await r.lrange(key, 0, -1)
+    return [orjson.loads(m) for m in messages]
+
+async def get_messages_cached(user_id):
+    """get_messages() behind a 5s in-process cache; writes from this process invalidate it"""
+    messages = _messages_cache.get(user_id)
+    if messages is None:
+        messages = await get_messages(user_id)
+        if messages:
+            _messages_cache[user_id] = messages
+    return messages
@@ -1,32 +1,42 @@
 import asyncio
-from datetime import datetime
+import logging
 from uuid import uuid4
+from pymongo import WriteConcern
 
-async def sla_background_task(get_pg_pool, mongo_db):
+logger = logging.getLogger(__name__)
+
+async def sla_background_task(pool, mongo_db):
+    # SLA events in MongoDB are informational and tolerate loss: don't wait for the server ack
+    events_coll = mongo_db.sla_events.with_options(write_concern=WriteConcern(w=0))
     while True:
         try:
-            pool = await get_pg_pool()
             async with pool.acquire() as conn:
-                rows = await conn.fetch("SELECT ticket_id, sla_deadline, status FROM tickets WHERE status='In-Progress'")
-                for row in rows:
-                    if row['sla_deadline'] < datetime.utcnow():
-                        await conn.execute(
-                            "UPDATE tickets SET status='Breached', updated_at=NOW() WHERE ticket_id=$1",
-                            row['ticket_id']
-                        )
-                        await conn.execute(
-                            "INSERT INTO sla_events (event_id, ticket_id, event, timestamp) VALUES ($1, $2, $3, NOW())",
-                            str(uuid4()), row['ticket_id'], "SLA Breached"
+                # Set-at-a-time: flip every breached open ticket and log the events in two statements.
+                # Index-driven via idx_tickets_open_sla_deadline (partial index on open tickets)
+                async with conn.transaction():
+                    rows = await conn.fetch(
+                        "UPDATE tickets SET status='Breached', updated_at=NOW() "
+                        "WHERE status='In-Progress' AND sla_deadline < (NOW() AT TIME ZONE 'UTC') "
+                        "RETURNING ticket_id, updated_at"
+                    )
+                    if rows:
+                        # COPY protocol: one bulk load, no per-row parse/plan
+                        await conn.copy_records_to_table(
+                            'sla_events',
+                            records=[(str(uuid4()), row['ticket_id'], 'SLA Breached', row['updated_at']) for row in rows],
+                            columns=['event_id', 'ticket_id', 'event', 'timestamp']
                         )
-                        await mongo_db.sla_events.insert_one({
-                            "ticket_id": row['ticket_id'],
-                            "event": "SLA Breached",
-                            "timestamp": datetime.utcnow()
-                        })
-            await pool.close()
+
+            if rows:
+                logger.info("Marked %d tickets as SLA breached", len(rows))
+                # Same timestamps as the PostgreSQL events (RETURNING updated_at)
+                await events_coll.insert_many(
+                    [{"ticket_id": row['ticket_id'], "event": "SLA Breached", "timestamp": row['updated_at']} for row in rows],
+                    ordered=False
+                )
         except Exception as e:
-            print(f"[SLA CHECKER ERROR] {str(e)}")
+            logger.exception("SLA checker pass failed: %s", e)
         await asyncio.sleep(300)  # 10 seconds for testing
 
-async def start_sla_checker(app, get_pg_pool, mongo_db):
-    asyncio.create_task(sla_background_task(get_pg_pool, mongo_db))
+async def start_sla_checker(app, pool, mongo_db):
+    return asyncio.create_task(sla_background_task(pool, mongo_db))
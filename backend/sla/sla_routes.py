@@ -1,23 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi import Depends
 from datetime import datetime
 import asyncio
 from uuid import uuid4
 
-def get_sla_router(get_pg_pool, mongo_db):
+def get_sla_router(mongo_db):
     router = APIRouter()
 
     @router.get("/api/sla/tickets")
-    async def list_sla_breaches():
+    async def list_sla_breaches(request: Request):
         """List all SLA breached tickets from PostgreSQL and MongoDB"""
-        pool = await get_pg_pool()
+        pool = request.app.state.pg_pool
         async with pool.acquire() as conn:
             rows = await conn.fetch("SELECT * FROM tickets WHERE status='Breached'")
-        await pool.close()
 
-        # Fetch SLA events from MongoDB
+        # Fetch SLA events from MongoDB for the breached tickets only
+        ticket_ids = [r["ticket_id"] for r in rows]
         events = []
-        async for doc in mongo_db.sla_events.find({}):
+        async for doc in mongo_db.sla_events.find({"ticket_id": {"$in": ticket_ids}}):
             events.append({
                 "ticket_id": doc["ticket_id"],
                 "event": doc["event"],
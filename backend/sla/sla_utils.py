@@ -1,15 +1,18 @@
 # backend/sla/sla_utils.py
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 
 # SLA rules in hours (change to seconds for fast testing)
 SLA_RULES = {
-    "low": 12,     
-    "medium": 6,  
-    "high": 3,     
-    "urgent": 1   
+    "low": 12,
+    "medium": 6,
+    "high": 3,
+    "urgent": 1
 }
 
+# Precomputed once; calculate_sla_deadline runs on every ticket creation
+_SLA_TIMEDELTAS = {priority: timedelta(hours=hours) for priority, hours in SLA_RULES.items()}
+_DEFAULT_SLA = timedelta(hours=6)
+
 def calculate_sla_deadline(priority: str):
-    hours = SLA_RULES.get(priority.lower(), 6)
-    from datetime import datetime, timedelta
-    return datetime.utcnow() + timedelta(hours=hours)
+    # Naive UTC, matching the tickets.sla_deadline TIMESTAMP column
+    return datetime.now(timezone.utc).replace(tzinfo=None) + _SLA_TIMEDELTAS.get(priority.lower(), _DEFAULT_SLA)
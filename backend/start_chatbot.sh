@@ -113,10 +113,16 @@ cd ..
 echo -e "${BLUE}📦 Installing Node.js dependencies...${NC}"
 npm install
 
+# Apply PostgreSQL migrations once before starting the backend
+echo -e "${BLUE}🔄 Applying database migrations...${NC}"
+cd backend
+python migrate.py
+cd ..
+
 # Start backend
 echo -e "${BLUE}🔄 Starting FastAPI backend...${NC}"
 cd backend
-python main.py &
+RUN_MIGRATIONS=0 python main.py &
 BACKEND_PID=$!
 cd ..
 
@@ -12,12 +12,13 @@ import {
   User as UserIcon,
   TrendingUp
 } from 'lucide-react';
-import { Admin, AdminTicket, AdminUser, AdminStats } from '../types';
+import { Admin, AdminTicket, AdminTicketPage, AdminUser, AdminStats } from '../types';
 import AdminTicketModal from '../components/AdminTicketModal';
 
 const AdminDashboard: React.FC = () => {
   const [activeTab, setActiveTab] = useState<'overview' | 'tickets' | 'users'>('overview');
   const [tickets, setTickets] = useState<AdminTicket[]>([]);
+  const [ticketsCursor, setTicketsCursor] = useState<string | null>(null);
   const [users, setUsers] = useState<AdminUser[]>([]);
   const [stats, setStats] = useState<AdminStats | null>(null);
   const [loading, setLoading] = useState(true);
@@ -55,8 +56,9 @@ const AdminDashboard: React.FC = () => {
       ]);
 
       if (ticketsRes.ok) {
-        const ticketsData = await ticketsRes.json();
-        setTickets(ticketsData);
+        const ticketsData: AdminTicketPage = await ticketsRes.json();
+        setTickets(ticketsData.tickets);
+        setTicketsCursor(ticketsData.next_cursor);
       }
 
       if (usersRes.ok) {
@@ -75,6 +77,23 @@ const AdminDashboard: React.FC = () => {
     }
   };
 
+  const loadMoreTickets = async () => {
+    if (!ticketsCursor) return;
+    try {
+      const response = await fetch(
+        `http://localhost:8000/api/admin/tickets?cursor=${encodeURIComponent(ticketsCursor)}`,
+        { headers: { 'Authorization': `Bearer ${adminToken}` } }
+      );
+      if (response.ok) {
+        const ticketsData: AdminTicketPage = await response.json();
+        setTickets(prev => [...prev, ...ticketsData.tickets]);
+        setTicketsCursor(ticketsData.next_cursor);
+      }
+    } catch (error) {
+      console.error('Error fetching more tickets:', error);
+    }
+  };
+
   const handleLogout = () => {
     localStorage.removeItem('adminToken');
     localStorage.removeItem('admin');
@@ -389,6 +408,21 @@ const AdminDashboard: React.FC = () => {
                     </tbody>
                   </table>
                 </div>
+                {ticketsCursor && (
+                  <div className="p-4 text-center border-t border-gray-200 dark:border-gray-700">
+                    {(searchTerm || statusFilter !== 'all' || priorityFilter !== 'all') && (
+                      <p className="mb-2 text-sm text-gray-500 dark:text-gray-400">
+                        Filters only cover the {tickets.length} tickets loaded so far. Load more to include older tickets.
+                      </p>
+                    )}
+                    <button
+                      onClick={loadMoreTickets}
+                      className="text-sm font-medium text-red-600 hover:text-red-700 dark:text-red-400 dark:hover:text-red-300"
+                    >
+                      Load more tickets
+                    </button>
+                  </div>
+                )}
               </div>
             </div>
           )}
@@ -73,6 +73,11 @@ export interface AdminTicket {
   user_email?: string;
 }
 
+export interface AdminTicketPage {
+  tickets: AdminTicket[];
+  next_cursor: string | null;
+}
+
 export interface AdminUser {
   _id: string;
   email: string;